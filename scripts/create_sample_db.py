@@ -4,18 +4,48 @@ Create a sample SQLite database for testing the Chat-with-SQL Agent.
 This generates a realistic e-commerce database with customers, products, orders, and reviews.
 """
 
-import json
-import random
 import sqlite3
-from datetime import datetime, timedelta
+from datetime import date, timedelta
+from itertools import chain, islice
 
-import pandas as pd
+import numpy as np
 from faker import Faker
 
 # Initialize Faker for generating realistic data
 fake = Faker()
 Faker.seed(42)  # For reproducible data
-random.seed(42)
+# Column values are drawn in batches from one generator instead of per row
+rng = np.random.default_rng(42)
+
+# Free-text columns that don't need unique values are sampled from a pool this size
+# instead of calling Faker once per row
+SAMPLE_POOL_SIZE = 256
+
+# SQLite's default cap on bound parameters per statement (before 3.32)
+SQLITE_MAX_VARIABLES = 999
+
+
+def days_before(today, offsets):
+    """Turn an array of day offsets into the dates that many days before today."""
+    return [today - timedelta(days=offset) for offset in offsets.tolist()]
+
+
+def insert_rows(cursor, table, rows):
+    """Insert rows with multi-row VALUES statements, as many rows as SQLite allows."""
+    rows = iter(rows)
+    first = next(rows, None)
+    if first is None:
+        return
+
+    width = len(first)
+    batch_size = max(1, SQLITE_MAX_VARIABLES // width)
+    row_placeholders = "(" + ", ".join(["?"] * width) + ")"
+    rows = chain([first], rows)
+    while batch := list(islice(rows, batch_size)):
+        cursor.execute(
+            f"INSERT INTO {table} VALUES " + ", ".join([row_placeholders] * len(batch)),
+            list(chain.from_iterable(batch)),
+        )
 
 
 def create_sample_database(db_path="sample_ecommerce.db"):
@@ -24,9 +54,25 @@ def create_sample_database(db_path="sample_ecommerce.db"):
     print("🚀 Creating sample e-commerce database...")
 
     # Connect to database
-    conn = sqlite3.connect(db_path)
+    # Autocommit mode: the driver issues no implicit BEGIN/COMMIT, so the explicit
+    # transaction below is the only one
+    conn = sqlite3.connect(db_path, isolation_level=None)
     cursor = conn.cursor()
 
+    # Bulk-load settings: fewer fsyncs and a page cache large enough for the whole build
+    cursor.executescript(
+        """
+    PRAGMA journal_mode=WAL;
+    PRAGMA synchronous=NORMAL;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA cache_size=-200000;
+    PRAGMA mmap_size=268435456;
+    """
+    )
+
+    # Build everything in one transaction so the journal is synced once, at commit
+    cursor.execute("BEGIN")
+
     # Drop existing tables if they exist
     tables = ["order_items", "reviews", "orders", "products", "categories", "customers"]
     for table in tables:
@@ -164,6 +210,9 @@ def create_sample_database(db_path="sample_ecommerce.db"):
     # Insert sample data
     print("📝 Inserting sample data...")
 
+    # Dates are drawn as day offsets from today in one batch per column, not per row
+    today = date.today()
+
     # Categories
     categories_data = [
         (1, "Electronics", "Electronic devices and gadgets"),
@@ -187,12 +236,22 @@ def create_sample_database(db_path="sample_ecommerce.db"):
     customers_data = []
     segments = ["Bronze", "Silver", "Gold", "Platinum"]
 
-    for i in range(1, 501):
+    n_customers = 500
+    genders = rng.choice(["M", "F", "Other"], n_customers).tolist()
+    # 95% get a coin flip for being active, the rest are inactive
+    is_active = (
+        (rng.random(n_customers) < 0.95) & (rng.integers(0, 2, n_customers) == 1)
+    ).astype(int).tolist()
+    customer_segments = rng.choice(segments, n_customers).tolist()
+    # Registered within the last two years, last logged in some time since registering
+    registration_offsets = rng.integers(0, 731, n_customers)
+    registration_dates = days_before(today, registration_offsets)
+    last_logins = days_before(today, rng.integers(0, registration_offsets + 1))
+
+    for i in range(1, n_customers + 1):
         first_name = fake.first_name()
         last_name = fake.last_name()
         email = f"{first_name.lower()}.{last_name.lower()}{i}@{fake.domain_name()}"
-        registration_date = fake.date_between(start_date="-2y", end_date="today")
-        last_login = fake.date_between(start_date=registration_date, end_date="today")
 
         customers_data.append(
             (
@@ -202,27 +261,22 @@ def create_sample_database(db_path="sample_ecommerce.db"):
                 email,
                 fake.phone_number(),
                 fake.date_of_birth(minimum_age=18, maximum_age=80),
-                random.choice(["M", "F", "Other"]),
+                genders[i - 1],
                 fake.country(),
                 fake.state(),
                 fake.city(),
                 fake.postcode(),
-                registration_date,
-                last_login,
-                random.choice([0, 1]) if random.random() < 0.95 else 0,  # 95% active
-                random.choice(segments),
+                registration_dates[i - 1],
+                last_logins[i - 1],
+                is_active[i - 1],
+                customer_segments[i - 1],
             )
         )
 
-    cursor.executemany(
-        """INSERT INTO customers VALUES 
-        (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-        customers_data,
-    )
+    insert_rows(cursor, "customers", customers_data)
 
     # Products (200 products)
     print("📦 Generating products...")
-    products_data = []
     brands = [
         "Apple",
         "Samsung",
@@ -238,43 +292,35 @@ def create_sample_database(db_path="sample_ecommerce.db"):
     colors = ["Black", "White", "Red", "Blue", "Green", "Silver", "Gold", "Gray"]
     sizes = ["XS", "S", "M", "L", "XL", "XXL", "One Size"]
 
-    for i in range(1, 201):
-        category_id = random.randint(1, 10)
-        brand = random.choice(brands)
-        price = round(random.uniform(10, 2000), 2)
-        cost = round(price * random.uniform(0.3, 0.7), 2)  # Cost is 30-70% of price
-        stock = random.randint(0, 500)
-        rating = round(random.uniform(1, 5), 1)
-        review_count = random.randint(0, 1000)
-
-        products_data.append(
-            (
-                i,
-                fake.catch_phrase(),
-                category_id,
-                brand,
-                price,
-                cost,
-                stock,
-                round(random.uniform(0.1, 50), 2),  # weight
-                f"{random.randint(10, 50)}x{random.randint(10, 50)}x{random.randint(5, 30)}cm",
-                random.choice(colors),
-                random.choice(sizes),
-                fake.text(max_nb_chars=200),
-                rating,
-                review_count,
-                1 if random.random() < 0.2 else 0,  # 20% featured
-                1 if random.random() < 0.95 else 0,  # 95% active
-                fake.date_between(start_date="-1y", end_date="today"),
-            )
-        )
-
-    cursor.executemany(
-        """INSERT INTO products VALUES 
-        (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-        products_data,
+    n_products = 200
+    prices = np.round(rng.uniform(10, 2000, n_products), 2)
+    # Cost is 30-70% of price
+    costs = np.round(prices * rng.uniform(0.3, 0.7, n_products), 2)
+    dimensions = rng.integers([10, 10, 5], [51, 51, 31], size=(n_products, 3))
+
+    # Rows are zipped lazily from the columns; insert_rows consumes one batch at a time
+    products_data = zip(
+        range(1, n_products + 1),
+        [fake.catch_phrase() for _ in range(n_products)],
+        rng.integers(1, 11, n_products).tolist(),  # category
+        rng.choice(brands, n_products).tolist(),
+        prices.tolist(),
+        costs.tolist(),
+        rng.integers(0, 501, n_products).tolist(),  # stock
+        np.round(rng.uniform(0.1, 50, n_products), 2).tolist(),  # weight
+        [f"{l}x{w}x{h}cm" for l, w, h in dimensions.tolist()],
+        rng.choice(colors, n_products).tolist(),
+        rng.choice(sizes, n_products).tolist(),
+        [fake.text(max_nb_chars=200) for _ in range(n_products)],
+        np.round(rng.uniform(1, 5, n_products), 1).tolist(),  # rating
+        rng.integers(0, 1001, n_products).tolist(),  # review count
+        (rng.random(n_products) < 0.2).astype(int).tolist(),  # 20% featured
+        (rng.random(n_products) < 0.95).astype(int).tolist(),  # 95% active
+        days_before(today, rng.integers(0, 366, n_products)),  # created
     )
 
+    insert_rows(cursor, "products", products_data)
+
     # Orders (1000 orders)
     print("🛒 Generating orders...")
     orders_data = []
@@ -294,10 +340,33 @@ def create_sample_database(db_path="sample_ecommerce.db"):
         "Cash on Delivery",
     ]
 
-    for i in range(1, 1001):
-        customer_id = random.randint(1, 500)
-        order_date = fake.date_between(start_date="-1y", end_date="today")
-        status = random.choice(statuses)
+    n_orders = 1000
+    customer_ids = rng.integers(1, 501, n_orders).tolist()
+    order_statuses = rng.choice(statuses, n_orders).tolist()
+    order_payment_methods = rng.choice(payment_methods, n_orders).tolist()
+    order_dates = days_before(today, rng.integers(0, 366, n_orders))
+    days_to_ship = rng.integers(1, 4, n_orders).tolist()
+    days_to_deliver = rng.integers(1, 8, n_orders).tolist()
+    tracking_numbers = rng.integers(100000, 1000000, n_orders).tolist()
+    has_notes = (rng.random(n_orders) < 0.1).tolist()
+    address_pool = [fake.address() for _ in range(SAMPLE_POOL_SIZE)]
+    addresses = rng.choice(address_pool, size=(n_orders, 2)).tolist()
+
+    subtotals = np.round(rng.uniform(20, 500, n_orders), 2)
+    tax_rate = 0.08  # 8% tax
+    tax_amounts = np.round(subtotals * tax_rate, 2)
+    shipping_costs = np.round(rng.uniform(5, 25, n_orders), 2)
+    discounts = np.where(
+        rng.random(n_orders) < 0.3, np.round(rng.uniform(0, subtotals * 0.2), 2), 0
+    )
+    totals = subtotals + tax_amounts + shipping_costs - discounts
+    amounts = np.column_stack(
+        [subtotals, tax_amounts, shipping_costs, discounts, totals]
+    ).tolist()
+
+    for i, money in enumerate(amounts, start=1):
+        order_date = order_dates[i - 1]
+        status = order_statuses[i - 1]
 
         # Determine shipped and delivered dates based on status
         shipped_date = None
@@ -305,128 +374,97 @@ def create_sample_database(db_path="sample_ecommerce.db"):
         tracking_number = None
 
         if status in ["Shipped", "Delivered"]:
-            shipped_date = order_date + timedelta(days=random.randint(1, 3))
-            tracking_number = f"TRK{random.randint(100000, 999999)}"
+            shipped_date = order_date + timedelta(days=days_to_ship[i - 1])
+            tracking_number = f"TRK{tracking_numbers[i - 1]}"
 
         if status == "Delivered":
-            delivered_date = shipped_date + timedelta(days=random.randint(1, 7))
-
-        subtotal = round(random.uniform(20, 500), 2)
-        tax_rate = 0.08  # 8% tax
-        tax_amount = round(subtotal * tax_rate, 2)
-        shipping_cost = round(random.uniform(5, 25), 2)
-        discount = (
-            round(random.uniform(0, subtotal * 0.2), 2) if random.random() < 0.3 else 0
-        )
-        total = subtotal + tax_amount + shipping_cost - discount
+            delivered_date = shipped_date + timedelta(days=days_to_deliver[i - 1])
 
         orders_data.append(
             (
                 i,
-                customer_id,
+                customer_ids[i - 1],
                 order_date,
                 status,
-                random.choice(payment_methods),
-                fake.address(),
-                fake.address(),
-                subtotal,
-                tax_amount,
-                shipping_cost,
-                discount,
-                total,
+                order_payment_methods[i - 1],
+                *addresses[i - 1],  # shipping and billing
+                *money,
                 shipped_date,
                 delivered_date,
                 tracking_number,
-                fake.text(max_nb_chars=100) if random.random() < 0.1 else None,
+                fake.text(max_nb_chars=100) if has_notes[i - 1] else None,
             )
         )
 
-    cursor.executemany(
-        """INSERT INTO orders VALUES 
-        (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-        orders_data,
-    )
+    insert_rows(cursor, "orders", orders_data)
 
     # Order Items (2000 order items)
     print("📋 Generating order items...")
-    order_items_data = []
-
-    for i in range(1, 2001):
-        order_id = random.randint(1, 1000)
-        product_id = random.randint(1, 200)
-        quantity = random.randint(1, 5)
+    n_order_items = 2000
 
-        # Get product price
-        cursor.execute("SELECT price FROM products WHERE product_id = ?", (product_id,))
-        unit_price = cursor.fetchone()[0]
-
-        discount_percent = random.uniform(0, 20) if random.random() < 0.2 else 0
-        line_total = round(unit_price * quantity * (1 - discount_percent / 100), 2)
-
-        order_items_data.append(
-            (
-                i,
-                order_id,
-                product_id,
-                quantity,
-                unit_price,
-                discount_percent,
-                line_total,
-            )
-        )
+    # Look prices up in memory instead of querying products once per order item
+    price_lookup = dict(cursor.execute("SELECT product_id, price FROM products"))
 
-    cursor.executemany(
-        """INSERT INTO order_items VALUES 
-        (?, ?, ?, ?, ?, ?, ?)""",
-        order_items_data,
+    product_ids = rng.integers(1, 201, n_order_items)
+    quantities = rng.integers(1, 6, n_order_items)
+    unit_prices = np.array([price_lookup[pid] for pid in product_ids.tolist()])
+    discount_percents = np.where(
+        rng.random(n_order_items) < 0.2, rng.uniform(0, 20, n_order_items), 0
+    )
+    line_totals = np.round(unit_prices * quantities * (1 - discount_percents / 100), 2)
+
+    order_items_data = zip(
+        range(1, n_order_items + 1),
+        rng.integers(1, 1001, n_order_items).tolist(),  # order
+        product_ids.tolist(),
+        quantities.tolist(),
+        unit_prices.tolist(),
+        discount_percents.tolist(),
+        line_totals.tolist(),
     )
 
+    insert_rows(cursor, "order_items", order_items_data)
+
     # Reviews (800 reviews)
     print("⭐ Generating reviews...")
-    reviews_data = []
-
-    for i in range(1, 801):
-        product_id = random.randint(1, 200)
-        customer_id = random.randint(1, 500)
-        order_id = random.randint(1, 1000) if random.random() < 0.8 else None
-        rating = random.choices([1, 2, 3, 4, 5], weights=[5, 10, 15, 35, 35])[0]
-
-        review_titles = [
-            "Great product!",
-            "Love it!",
-            "Excellent quality",
-            "Good value",
-            "Not what I expected",
-            "Amazing!",
-            "Perfect",
-            "Disappointed",
-            "Highly recommend",
-            "Outstanding",
-            "Poor quality",
-            "Fantastic",
-        ]
-
-        reviews_data.append(
-            (
-                i,
-                product_id,
-                customer_id,
-                order_id,
-                rating,
-                random.choice(review_titles),
-                fake.text(max_nb_chars=300),
-                fake.date_between(start_date="-1y", end_date="today"),
-                1 if order_id else 0,  # Verified if linked to order
-                random.randint(0, 50),
-            )
-        )
+    review_titles = [
+        "Great product!",
+        "Love it!",
+        "Excellent quality",
+        "Good value",
+        "Not what I expected",
+        "Amazing!",
+        "Perfect",
+        "Disappointed",
+        "Highly recommend",
+        "Outstanding",
+        "Poor quality",
+        "Fantastic",
+    ]
 
-    cursor.executemany(
-        """INSERT INTO reviews VALUES 
-        (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-        reviews_data,
+    n_reviews = 800
+    review_text_pool = [fake.text(max_nb_chars=300) for _ in range(SAMPLE_POOL_SIZE)]
+    ratings = [1, 2, 3, 4, 5]
+    rating_weights = [0.05, 0.10, 0.15, 0.35, 0.35]
+    # 80% of reviews are linked to an order, and those count as verified purchases
+    linked = rng.random(n_reviews) < 0.8
+    review_order_ids = np.where(linked, rng.integers(1, 1001, n_reviews), 0).tolist()
+
+    reviews_data = zip(
+        range(1, n_reviews + 1),
+        rng.integers(1, 201, n_reviews).tolist(),  # product
+        rng.integers(1, 501, n_reviews).tolist(),  # customer
+        [order_id or None for order_id in review_order_ids],
+        rng.choice(ratings, n_reviews, p=rating_weights).tolist(),
+        rng.choice(review_titles, n_reviews).tolist(),
+        rng.choice(review_text_pool, n_reviews).tolist(),
+        days_before(today, rng.integers(0, 366, n_reviews)),  # review date
+        linked.astype(int).tolist(),
+        rng.integers(0, 51, n_reviews).tolist(),  # helpful votes
     )
 
+    insert_rows(cursor, "reviews", reviews_data)
+
     # Create indexes for better query performance
     print("🚀 Creating indexes...")
     indexes = [
@@ -446,8 +484,14 @@ def create_sample_database(db_path="sample_ecommerce.db"):
     for index in indexes:
         cursor.execute(index)
 
+    # Gather statistics so the query planner can choose between the new indexes
+    cursor.execute("ANALYZE")
+
     # Commit changes
-    conn.commit()
+    cursor.execute("COMMIT")
+
+    # Fold the WAL back into the file so the database can be uploaded as a single .db
+    cursor.execute("PRAGMA journal_mode=DELETE")
 
     # Print summary statistics
     print("\n📊 Database Summary:")
@@ -1,50 +1,190 @@
-from langchain.agents import AgentType, initialize_agent
+import functools
+import hashlib
+import os
+from typing import Optional
+
+import httpx
+from langchain_community.agent_toolkits import create_sql_agent as create_tool_calling_sql_agent
 from langchain_community.agent_toolkits.sql.toolkit import SQLDatabaseToolkit
 from langchain_community.utilities import SQLDatabase
 from langchain_openai import ChatOpenAI
+from sqlalchemy.engine import Engine, make_url
 from config import settings
-from tools import get_custom_tools
 
 
-def create_sql_agent(database_uri: str, model_name: str = "gpt-3.5-turbo"):
+@functools.lru_cache(maxsize=1)
+def get_http_client() -> httpx.Client:
+    """
+    Return the HTTP client shared by every ChatOpenAI instance.
+
+    Reusing a single client keeps one connection pool (and its TLS sessions)
+    alive across agent rebuilds instead of opening a new pool per agent.
+
+    Returns:
+        Process-wide httpx client
+    """
+    return httpx.Client()
+
+
+def get_prompt_cache_key(database_uri: str) -> str:
+    """
+    Build the OpenAI prompt-cache routing key for a database.
+
+    Requests sharing a key are routed to the same prompt cache, so the long,
+    stable instruction/schema prefix of each agent turn is served as cached
+    input tokens. Keying on the database keeps different schemas apart.
+
+    Args:
+        database_uri: Database connection string
+
+    Returns:
+        Stable cache key for the database
+    """
+    digest = hashlib.sha256(database_uri.encode("utf-8")).hexdigest()[:16]
+    return f"chat-sql-agent-{digest}"
+
+
+def create_llm(model_name: str, database_uri: str, **kwargs) -> ChatOpenAI:
+    """
+    Create the chat model used by the SQL agents.
+
+    Args:
+        model_name: OpenAI model to use
+        database_uri: Database the agent talks to (used for the prompt-cache key)
+        **kwargs: Extra keyword arguments passed to ChatOpenAI
+
+    Returns:
+        Configured ChatOpenAI instance
+    """
+    return ChatOpenAI(
+        model=model_name,
+        temperature=0,
+        api_key=settings.OPENAI_API_KEY,
+        timeout=settings.OPENAI_TIMEOUT,
+        max_retries=settings.OPENAI_MAX_RETRIES,
+        http_client=get_http_client(),
+        extra_body={"prompt_cache_key": get_prompt_cache_key(database_uri)},
+        **kwargs,
+    )
+
+
+def get_database_mtime(database_uri: str) -> Optional[float]:
+    """
+    Return the modification time of a SQLite database file.
+
+    Args:
+        database_uri: Database connection string
+
+    Returns:
+        File mtime for an existing SQLite file, otherwise None
+    """
+    url = make_url(database_uri)
+    if url.get_backend_name() != "sqlite" or not url.database:
+        return None
+    try:
+        return os.path.getmtime(url.database)
+    except OSError:
+        return None
+
+
+def memoize_agent(factory):
+    """
+    Reuse the agent built by a factory for the same arguments.
+
+    Building an agent introspects the database schema and wires up the LLM
+    and toolkit, so repeated calls with the same database, model and flags
+    return the cached agent. A SQLite database is rebuilt once its file
+    changes on disk. Calls that pass their own engine are not memoized: the
+    caller owns that engine and any caching around it, and holding it here
+    would keep disposed engines and their pools alive.
+
+    Args:
+        factory: Agent factory taking the database URI as its first argument
+
+    Returns:
+        Memoized factory; call its cache_clear() to drop every cached agent
+    """
+
+    @functools.lru_cache(maxsize=16)
+    def build(database_uri, database_mtime, args, kwargs):
+        return factory(database_uri, *args, **dict(kwargs))
+
+    @functools.wraps(factory)
+    def wrapper(database_uri: str, *args, **kwargs):
+        if kwargs.get("engine") is not None:
+            return factory(database_uri, *args, **kwargs)
+        return build(
+            database_uri,
+            get_database_mtime(database_uri),
+            args,
+            tuple(sorted(kwargs.items())),
+        )
+
+    wrapper.cache_clear = build.cache_clear
+    return wrapper
+
+
+def get_sql_database(database_uri: str, engine: Optional[Engine] = None) -> SQLDatabase:
+    """
+    Wrap a database for the SQL toolkit, reusing an existing engine when given.
+
+    Args:
+        database_uri: Database connection string, used when no engine is given
+        engine: Optional SQLAlchemy engine whose connection pool should be shared
+
+    Returns:
+        SQLDatabase for the toolkit
+    """
+    if engine is not None:
+        return SQLDatabase(engine)
+    return SQLDatabase.from_uri(database_uri)
+
+
+@memoize_agent
+def create_sql_agent(
+    database_uri: str,
+    model_name: str = "gpt-3.5-turbo",
+    engine: Optional[Engine] = None,
+):
     """
     Create a SQL agent that can interact with a database using natural language.
 
     Args:
         database_uri: Database connection string (e.g., "sqlite:///path/to/db.sqlite")
         model_name: OpenAI model to use for the agent
+        engine: Optional SQLAlchemy engine to share instead of creating a new one
 
     Returns:
         Configured SQL agent
     """
-    db = SQLDatabase.from_uri(database_uri)
+    db = get_sql_database(database_uri, engine)
 
-    llm = ChatOpenAI(model=model_name, temperature=0, api_key=settings.OPENAI_API_KEY)
+    llm = create_llm(model_name, database_uri)
 
     toolkit = SQLDatabaseToolkit(db=db, llm=llm)
 
-    # Get SQL tools from toolkit
-    sql_tools = toolkit.get_tools()
-
-    agent = initialize_agent(
-        sql_tools,
+    # Native tool calls instead of a ReAct text loop: no Thought/Action preamble to
+    # pay for or parse on every step
+    agent = create_tool_calling_sql_agent(
         llm,
-        agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
+        toolkit=toolkit,
+        agent_type="tool-calling",
         verbose=True,
-        handle_parsing_errors=True,
         max_iterations=10,
-        early_stopping_method="generate",
-        return_intermediate_steps=True
+        max_execution_time=settings.AGENT_MAX_EXECUTION_TIME,
+        agent_executor_kwargs={"return_intermediate_steps": True},
     )
 
     return agent
 
 
+@memoize_agent
 def create_advanced_sql_agent(
     database_uri: str,
     model_name: str = "gpt-4",
     enable_reporting: bool = True,
     enable_email: bool = True,
+    engine: Optional[Engine] = None,
 ):
     """
     Create an advanced SQL agent with additional capabilities.
@@ -54,33 +194,36 @@ def create_advanced_sql_agent(
         model_name: OpenAI model to use
         enable_reporting: Whether to include reporting tools
         enable_email: Whether to include email tools
+        engine: Optional SQLAlchemy engine to share instead of creating a new one
 
     Returns:
         Configured advanced SQL agent
     """
-    db = SQLDatabase.from_uri(database_uri)
+    db = get_sql_database(database_uri, engine)
 
-    llm = ChatOpenAI(model=model_name, temperature=0, api_key=settings.OPENAI_API_KEY)
+    llm = create_llm(model_name, database_uri)
 
     toolkit = SQLDatabaseToolkit(db=db, llm=llm)
 
-    # Get SQL tools from toolkit
-    sql_tools = toolkit.get_tools()
-    # Add optional custom tools
-    custom_tools = get_custom_tools(
-        enable_reporting=enable_reporting,
-        enable_email=enable_email,
-    )
+    # Add optional custom tools; their modules are only imported when one is enabled
+    custom_tools = []
+    if enable_reporting or enable_email:
+        from tools import get_custom_tools
+
+        custom_tools = get_custom_tools(
+            enable_reporting=enable_reporting,
+            enable_email=enable_email,
+        )
 
-    agent = initialize_agent(
-        sql_tools + custom_tools,
+    agent = create_tool_calling_sql_agent(
         llm,
-        agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
+        toolkit=toolkit,
+        agent_type="tool-calling",
+        extra_tools=custom_tools,
         verbose=True,
-        handle_parsing_errors=True,
         max_iterations=10,
-        early_stopping_method="generate",
-        return_intermediate_steps=True
+        max_execution_time=settings.AGENT_MAX_EXECUTION_TIME,
+        agent_executor_kwargs={"return_intermediate_steps": True},
     )
 
     return agent
@@ -16,6 +16,15 @@ class Settings(BaseSettings):
     OPENAI_MODEL: str = Field(
         default="gpt-3.5-turbo", description="OpenAI model to use"
     )
+    OPENAI_TIMEOUT: float = Field(
+        default=30.0, description="Timeout in seconds for a single OpenAI request"
+    )
+    OPENAI_MAX_RETRIES: int = Field(
+        default=2, description="Retries for a failed OpenAI request"
+    )
+    AGENT_MAX_EXECUTION_TIME: float = Field(
+        default=30.0, description="Wall-clock limit in seconds for one agent run"
+    )
 
     # Database Configuration
     DEFAULT_DB_URL: Optional[str] = Field(
@@ -31,6 +40,9 @@ class Settings(BaseSettings):
     SMTP_USE_TLS: bool = Field(default=True, description="Use TLS for SMTP connection")
     SMTP_USERNAME: Optional[str] = Field(default=None, description="SMTP username")
     SMTP_PASSWORD: Optional[str] = Field(default=None, description="SMTP password")
+    SMTP_TIMEOUT: float = Field(
+        default=15.0, description="Seconds to wait on the SMTP server before giving up"
+    )
 
     # Application Configuration
     DEBUG: bool = Field(default=False, description="Enable debug mode")
@@ -73,6 +85,23 @@ class Settings(BaseSettings):
     )
     AGENT_TIMEOUT: int = Field(default=300, description="Agent timeout in seconds")
     VERBOSE_AGENT: bool = Field(default=True, description="Enable verbose agent output")
+    SEMANTIC_CACHE_ENABLED: bool = Field(
+        default=False, description="Reuse answers for semantically similar questions"
+    )
+    SEMANTIC_CACHE_THRESHOLD: float = Field(
+        default=0.92, description="Minimum cosine similarity for a semantic cache hit"
+    )
+    SEMANTIC_CACHE_TTL: float = Field(
+        default=600.0, description="Seconds a semantic cache answer stays valid"
+    )
+    MAX_MESSAGES: int = Field(
+        default=200,
+        description="Chat messages kept in memory per session; all are persisted to disk",
+    )
+    MAX_CONTEXT_TOKENS: int = Field(
+        default=12000,
+        description="Tokens of chat history kept in memory before older messages are trimmed",
+    )
 
     # Database Connection Pool Settings
     DB_POOL_SIZE: int = Field(default=10, description="Database connection pool size")
@@ -80,6 +109,9 @@ class Settings(BaseSettings):
         default=20, description="Database connection pool max overflow"
     )
     DB_POOL_TIMEOUT: int = Field(default=30, description="Database connection timeout")
+    DB_CONNECT_TIMEOUT: int = Field(
+        default=5, description="Seconds to wait for a database server to accept a connection"
+    )
 
     # GitHub App Configuration
     GITHUB_APP_ID: Optional[str] = Field(
@@ -0,0 +1,124 @@
+"""
+Chat history storage for Chat SQL Agent
+"""
+import functools
+import json
+import os
+import sqlite3
+import threading
+from typing import Callable, Dict, Iterator, List, Optional
+
+DEFAULT_DB_PATH = os.path.join(os.path.expanduser("~"), ".cache", "chat_sql_agent", "history.db")
+
+_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=None)
+def _connect(db_path: str) -> sqlite3.Connection:
+    """Open the history database once per process, in WAL mode so appends stay cheap"""
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS messages ("
+        "id INTEGER PRIMARY KEY AUTOINCREMENT, session_id TEXT NOT NULL, message TEXT NOT NULL)"
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_messages_session ON messages (session_id, id)")
+    conn.commit()
+    return conn
+
+
+class MessageStore:
+    """Chat transcript persisted to SQLite, with only the most recent messages kept in memory"""
+
+    def __init__(
+        self,
+        session_id: str,
+        max_in_memory: int = 100,
+        db_path: str = DEFAULT_DB_PATH,
+        count_tokens: Optional[Callable[[str], int]] = None,
+    ):
+        """
+        Args:
+            session_id: Identifier of the chat session; reusing it restores the transcript
+            max_in_memory: Number of most recent messages kept in memory
+            db_path: SQLite database every message is written to
+            count_tokens: Optional function returning the token count of a message's content
+        """
+        self.session_id = session_id
+        self.max_in_memory = max_in_memory
+        self.db_path = db_path
+        self._count_tokens = count_tokens
+        self._conn = _connect(db_path)
+
+        with _lock:
+            rows = self._conn.execute(
+                "SELECT message FROM messages WHERE session_id = ? ORDER BY id DESC LIMIT ?",
+                (session_id, max_in_memory),
+            ).fetchall()
+        self.messages: List[Dict[str, str]] = [json.loads(row[0]) for row in reversed(rows)]
+        # Running total of in-memory content length, so size checks don't rescan the transcript
+        self.char_count = sum(len(message["content"]) for message in self.messages)
+        self.token_count = sum(self._tokens(message) for message in self.messages)
+
+    def _tokens(self, message: Dict[str, str]) -> int:
+        """Token count of a message, computed once and kept on it under "tokens"."""
+        if self._count_tokens is None:
+            return 0
+        if "tokens" not in message:
+            message["tokens"] = self._count_tokens(message["content"])
+        return message["tokens"]
+
+    def append(self, message: Dict[str, str]) -> None:
+        """Add a message, dropping the oldest from memory once the window is full."""
+        # Count before writing so the token count is persisted with the message
+        tokens = self._tokens(message)
+        with _lock:
+            self._conn.execute(
+                "INSERT INTO messages (session_id, message) VALUES (?, ?)",
+                (self.session_id, json.dumps(message)),
+            )
+            self._conn.commit()
+        self.messages.append(message)
+        self.char_count += len(message["content"])
+        self.token_count += tokens
+        if len(self.messages) > self.max_in_memory:
+            self.trim(self.max_in_memory)
+
+    def trim(self, keep: int) -> None:
+        """Keep only the last `keep` messages in memory; all messages stay on disk."""
+        overflow = len(self.messages) - max(keep, 0)
+        if overflow > 0:
+            dropped = self.messages[:overflow]
+            self.char_count -= sum(len(message["content"]) for message in dropped)
+            self.token_count -= sum(self._tokens(message) for message in dropped)
+            self.messages = self.messages[overflow:]
+
+    def recent(self, n: int) -> List[Dict[str, str]]:
+        """Return the last n in-memory messages."""
+        return self.messages[-n:] if n > 0 else []
+
+    def all(self) -> List[Dict[str, str]]:
+        """Return the full transcript, including messages no longer held in memory."""
+        with _lock:
+            rows = self._conn.execute(
+                "SELECT message FROM messages WHERE session_id = ? ORDER BY id",
+                (self.session_id,),
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def clear(self) -> None:
+        """Forget the whole transcript, in memory and on disk."""
+        with _lock:
+            self._conn.execute("DELETE FROM messages WHERE session_id = ?", (self.session_id,))
+            self._conn.commit()
+        self.messages = []
+        self.char_count = 0
+        self.token_count = 0
+
+    def __len__(self) -> int:
+        return len(self.messages)
+
+    def __iter__(self) -> Iterator[Dict[str, str]]:
+        return iter(self.messages)
@@ -0,0 +1,121 @@
+"""
+Semantic answer cache for Chat SQL Agent
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, List, Optional, Sequence
+
+import numpy as np
+
+
+class SemanticCache:
+    """Cache agent answers keyed on the embedding similarity of the question"""
+
+    def __init__(
+        self,
+        embed_model: str = "text-embedding-3-small",
+        threshold: float = 0.92,
+        max_entries: int = 256,
+        ttl: Optional[float] = 600.0,
+        embed_fn: Optional[Callable[[str], Sequence[float]]] = None,
+    ):
+        """
+        Args:
+            embed_model: OpenAI embedding model used when no embed_fn is given
+            threshold: Minimum cosine similarity for a cached answer to be reused
+            max_entries: Maximum cached answers per database (oldest evicted first)
+            ttl: Seconds a cached answer stays valid, or None to keep it until evicted
+            embed_fn: Optional function mapping text to an embedding vector
+        """
+        self.embed_model = embed_model
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._embed_fn = embed_fn
+        self._entries = {}
+        self._last_embedding = (None, None)
+        self._lock = threading.Lock()
+
+    def _embed(self, text: str) -> np.ndarray:
+        """Return the normalized embedding for text, reusing the last one computed"""
+        last_text, last_vector = self._last_embedding
+        if text == last_text:
+            return last_vector
+
+        if self._embed_fn is None:
+            from langchain_openai import OpenAIEmbeddings
+
+            from agents import get_http_client
+            from config import settings
+
+            embeddings = OpenAIEmbeddings(
+                model=self.embed_model,
+                api_key=settings.OPENAI_API_KEY,
+                timeout=settings.OPENAI_TIMEOUT,
+                max_retries=settings.OPENAI_MAX_RETRIES,
+                http_client=get_http_client(),
+            )
+            self._embed_fn = embeddings.embed_query
+
+        vector = np.asarray(self._embed_fn(text), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm:
+            vector = vector / norm
+
+        self._last_embedding = (text, vector)
+        return vector
+
+    def lookup(self, prompt: str, db_url: str) -> Optional[str]:
+        """
+        Find a cached answer for a question asked against a database.
+
+        Args:
+            prompt: User question
+            db_url: Database the question is asked against
+
+        Returns:
+            Cached answer, or None on a miss
+        """
+        with self._lock:
+            entries = self._entries.get(db_url)
+            if entries and self.ttl is not None:
+                # Entries are kept in insertion order, so expired ones are at the front
+                expired_before = time.monotonic() - self.ttl
+                while entries and next(iter(entries.values()))[2] < expired_before:
+                    entries.popitem(last=False)
+            if not entries:
+                return None
+            vectors = np.stack([vector for vector, _, _ in entries.values()])
+            answers: List[str] = [answer for _, answer, _ in entries.values()]
+
+        scores = vectors @ self._embed(prompt)
+        best = int(np.argmax(scores))
+        if scores[best] >= self.threshold:
+            return answers[best]
+        return None
+
+    def put(self, prompt: str, db_url: str, answer: str) -> None:
+        """
+        Store an answer for a question asked against a database.
+
+        Args:
+            prompt: User question
+            db_url: Database the question was asked against
+            answer: Agent answer to cache
+        """
+        vector = self._embed(prompt)
+        with self._lock:
+            entries = self._entries.setdefault(db_url, OrderedDict())
+            entries[prompt] = (vector, answer, time.monotonic())
+            entries.move_to_end(prompt)
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+
+    def clear(self, db_url: Optional[str] = None) -> None:
+        """Drop cached answers for one database, or for all databases"""
+        with self._lock:
+            if db_url is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(db_url, None)
@@ -1,15 +1,17 @@
+import contextlib
 import os
 import smtplib
+import threading
+from collections import OrderedDict
 from email.mime.application import MIMEApplication
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
-from typing import List, Optional, Type
+from typing import Iterator, List, Optional, Type
 
 from langchain.tools import BaseTool
 from pydantic import BaseModel, Field
 
 from config import settings
-from visualization_tools import get_visualization_tools
 
 
 class SendEmailInput(BaseModel):
@@ -37,6 +39,104 @@ class SendEmailTool(BaseTool):
             return f"Failed to send email: {str(e)}"
 
 
+# Idle SMTP connections keyed by their settings, oldest first. smtplib clients are not
+# thread-safe, so a connection is checked out of the pool while in use; _smtp_lock only
+# guards the pool itself and is never held across network I/O.
+_SMTP_MAX_CONNECTIONS = 4
+_smtp_connections: "OrderedDict[tuple, smtplib.SMTP]" = OrderedDict()
+_smtp_lock = threading.Lock()
+
+
+def _open_smtp(
+    server: str, port: int, use_tls: bool, username: Optional[str], password: Optional[str]
+) -> smtplib.SMTP:
+    """Open and authenticate an SMTP connection"""
+    connection = smtplib.SMTP(server, port, timeout=settings.SMTP_TIMEOUT)
+    try:
+        if use_tls:
+            connection.starttls()
+
+        # Only authenticate if credentials are provided
+        if username and password:
+            connection.login(username, password)
+    except BaseException:
+        connection.close()
+        raise
+
+    return connection
+
+
+def _close_smtp(connection: smtplib.SMTP) -> None:
+    try:
+        connection.quit()
+    except (smtplib.SMTPException, OSError):
+        connection.close()
+
+
+def close_smtp_connections() -> None:
+    """Close and forget every idle SMTP connection."""
+    with _smtp_lock:
+        connections = list(_smtp_connections.values())
+        _smtp_connections.clear()
+    for connection in connections:
+        _close_smtp(connection)
+
+
+@contextlib.contextmanager
+def smtp_connection(
+    server: str,
+    port: int,
+    use_tls: bool = True,
+    username: Optional[str] = None,
+    password: Optional[str] = None,
+) -> Iterator[smtplib.SMTP]:
+    """
+    Use a live SMTP connection, reusing the previous one for the same settings.
+
+    The connection is checked out of the pool for the duration of the with block
+    and returned afterwards; it is closed instead if the block raises.
+
+    Args:
+        server: SMTP server hostname
+        port: SMTP server port
+        use_tls: Whether to upgrade the connection with STARTTLS
+        username: Optional SMTP username
+        password: Optional SMTP password
+
+    Yields:
+        Connected (and, with credentials, authenticated) SMTP client
+    """
+    key = (server, port, use_tls, username or None, password or None)
+    with _smtp_lock:
+        connection = _smtp_connections.pop(key, None)
+
+    if connection is not None:
+        try:
+            connection.noop()
+        except smtplib.SMTPServerDisconnected:
+            # The server dropped the idle connection; open a fresh one
+            _close_smtp(connection)
+            connection = None
+    if connection is None:
+        connection = _open_smtp(*key)
+
+    try:
+        yield connection
+    except BaseException:
+        # Do not reuse a connection left in an unknown state
+        _close_smtp(connection)
+        raise
+
+    with _smtp_lock:
+        # Another session may have returned a connection for the same settings meanwhile
+        stale = [_smtp_connections.pop(key)] if key in _smtp_connections else []
+        _smtp_connections[key] = connection
+        while len(_smtp_connections) > _SMTP_MAX_CONNECTIONS:
+            stale.append(_smtp_connections.popitem(last=False)[1])
+    for old in stale:
+        _close_smtp(old)
+
+
 def send_email(
     report_path: str,
     to: str,
@@ -73,16 +173,14 @@ def send_email(
         msg.attach(attach)
 
     try:
-        server = smtplib.SMTP(settings.SMTP_SERVER, settings.SMTP_PORT)
-        if settings.SMTP_USE_TLS:
-            server.starttls()
-        
-        # Only authenticate if credentials are provided
-        if settings.SMTP_USERNAME and settings.SMTP_PASSWORD:
-            server.login(settings.SMTP_USERNAME, settings.SMTP_PASSWORD)
-
-        server.send_message(msg)
-        server.quit()
+        with smtp_connection(
+            settings.SMTP_SERVER,
+            settings.SMTP_PORT,
+            settings.SMTP_USE_TLS,
+            settings.SMTP_USERNAME,
+            settings.SMTP_PASSWORD,
+        ) as server:
+            server.send_message(msg)
 
         return f"Email sent successfully to {to}"
         
@@ -140,6 +238,9 @@ def get_custom_tools(enable_reporting: bool = True, enable_email: bool = True, d
         tools.append(SendEmailTool())
 
     if enable_reporting:
+        # Plotting libraries are only imported when reporting is enabled
+        from visualization_tools import get_visualization_tools
+
         # Only add the database visualization tools (not the duplicate QueryVisualizationTool)
         tools.extend(get_visualization_tools(db_path))
     
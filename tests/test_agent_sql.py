@@ -5,14 +5,16 @@ import tempfile
 from unittest.mock import MagicMock, patch
 
 import pytest
+from sqlalchemy import create_engine
 
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
 
-from agents import create_sql_agent
+from agents import create_sql_agent, memoize_agent
 from config import Settings
 from reporting import dataframe_to_pdf, dataframe_to_plot
-from tools import get_custom_tools, send_email
+import tools
+from tools import get_custom_tools, send_email, smtp_connection
 
 
 class TestSQLAgent:
@@ -143,6 +145,40 @@ class TestSQLAgent:
             # Expected to fail without real OpenAI API key
             assert "openai" in str(e).lower() or "api" in str(e).lower()
 
+    def test_agent_memoized(self, test_db):
+        """Test agents are reused until the SQLite file changes."""
+        calls = []
+
+        @memoize_agent
+        def build_agent(database_uri, model_name="gpt-4"):
+            calls.append(model_name)
+            return object()
+
+        first = build_agent(test_db)
+        assert build_agent(test_db) is first
+        assert build_agent(test_db, model_name="gpt-4o") is not first
+        assert len(calls) == 2
+
+        db_path = test_db[len("sqlite:///"):]
+        mtime = os.path.getmtime(db_path)
+        os.utime(db_path, (mtime + 10, mtime + 10))
+        assert build_agent(test_db) is not first
+        assert len(calls) == 3
+
+    def test_agent_not_memoized_with_engine(self, test_db):
+        """Test agents built on a caller-supplied engine are not cached."""
+        calls = []
+
+        @memoize_agent
+        def build_agent(database_uri, engine=None):
+            calls.append(engine)
+            return object()
+
+        engine = create_engine(test_db)
+        assert build_agent(test_db, engine=engine) is not build_agent(test_db, engine=engine)
+        assert len(calls) == 2
+        engine.dispose()
+
     def test_custom_tools_creation(self):
         """Test custom tools creation."""
         tools = get_custom_tools(enable_reporting=True, enable_email=True)
@@ -160,6 +196,45 @@ class TestSQLAgent:
         with pytest.raises(FileNotFoundError):
             send_email("non_existent_file.pdf", "test@example.com")
 
+    @patch("tools.smtplib.SMTP")
+    def test_smtp_connection_reused(self, mock_smtp):
+        """Test SMTP connections are reused and reopened after a disconnect."""
+        import smtplib
+
+        tools.close_smtp_connections()
+        with smtp_connection("smtp.test.com", 587, True, "user", "pass") as first:
+            pass
+        with smtp_connection("smtp.test.com", 587, True, "user", "pass") as second:
+            pass
+        assert first is second
+        assert mock_smtp.call_count == 1
+        first.login.assert_called_once_with("user", "pass")
+
+        first.noop.side_effect = smtplib.SMTPServerDisconnected()
+        mock_smtp.return_value = MagicMock()
+        with smtp_connection("smtp.test.com", 587, True, "user", "pass") as third:
+            pass
+        assert third is not first
+        assert mock_smtp.call_count == 2
+        first.quit.assert_called_once()
+
+        tools.close_smtp_connections()
+        third.quit.assert_called_once()
+
+    @patch("tools.smtplib.SMTP")
+    def test_smtp_connection_closed_on_failed_login(self, mock_smtp):
+        """Test a connection whose login fails is closed and not pooled."""
+        import smtplib
+
+        tools.close_smtp_connections()
+        mock_smtp.return_value.login.side_effect = smtplib.SMTPAuthenticationError(535, b"bad")
+        with pytest.raises(smtplib.SMTPAuthenticationError):
+            with smtp_connection("smtp.test.com", 587, True, "user", "wrong"):
+                pass
+        mock_smtp.return_value.close.assert_called_once()
+        assert mock_smtp.call_args.kwargs["timeout"] > 0
+        assert not tools._smtp_connections
+
     def test_reporting_functions(self):
         """Test reporting functions with sample data."""
         import pandas as pd
@@ -0,0 +1,103 @@
+import os
+import sys
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+
+from history import MessageStore
+
+
+class TestMessageStore:
+    """Test suite for the SQLite-backed chat message store."""
+
+    @pytest.fixture
+    def db_path(self, tmp_path):
+        return str(tmp_path / "history.db")
+
+    @pytest.fixture
+    def store(self, db_path):
+        return MessageStore("session", max_in_memory=3, db_path=db_path)
+
+    @staticmethod
+    def message(i):
+        return {"role": "user", "content": f"message {i}"}
+
+    def test_keeps_recent_messages_in_memory(self, store):
+        """Only the newest max_in_memory messages stay in memory."""
+        for i in range(5):
+            store.append(self.message(i))
+
+        assert len(store) == 3
+        assert [m["content"] for m in store] == ["message 2", "message 3", "message 4"]
+        assert store.recent(2) == [self.message(3), self.message(4)]
+
+    def test_all_includes_evicted_messages(self, store):
+        """The full transcript is recovered from disk, in order."""
+        for i in range(5):
+            store.append(self.message(i))
+
+        assert store.all() == [self.message(i) for i in range(5)]
+
+    def test_trim(self, store):
+        """Trimming drops older messages from memory without losing them."""
+        for i in range(3):
+            store.append(self.message(i))
+        store.trim(1)
+
+        assert list(store) == [self.message(2)]
+        assert len(store.all()) == 3
+
+    def test_char_count(self, store, db_path):
+        """The running character count tracks the in-memory messages."""
+        for i in range(5):
+            store.append(self.message(i))
+        assert store.char_count == sum(len(m["content"]) for m in store)
+
+        store.trim(1)
+        assert store.char_count == len("message 4")
+        assert MessageStore("session", max_in_memory=3, db_path=db_path).char_count == 3 * len("message 4")
+
+        store.clear()
+        assert store.char_count == 0
+
+    def test_token_count(self, db_path):
+        """Tokens are counted once per message and persisted with it."""
+        calls = []
+
+        def count_tokens(text):
+            calls.append(text)
+            return len(text.split())
+
+        store = MessageStore("session", max_in_memory=3, db_path=db_path, count_tokens=count_tokens)
+        for i in range(5):
+            store.append(self.message(i))
+        assert store.token_count == 3 * 2
+        assert len(calls) == 5
+
+        restored = MessageStore("session", max_in_memory=3, db_path=db_path, count_tokens=count_tokens)
+        assert restored.token_count == 3 * 2
+        assert len(calls) == 5
+
+        restored.trim(1)
+        assert restored.token_count == 2
+
+    def test_restores_session(self, store, db_path):
+        """A new store for the same session reloads its most recent messages."""
+        for i in range(5):
+            store.append(self.message(i))
+
+        restored = MessageStore("session", max_in_memory=3, db_path=db_path)
+        assert list(restored) == [self.message(i) for i in range(2, 5)]
+        assert len(MessageStore("other", db_path=db_path)) == 0
+
+    def test_clear(self, store, db_path):
+        """Clearing forgets both in-memory and persisted messages."""
+        for i in range(5):
+            store.append(self.message(i))
+        store.clear()
+
+        assert len(store) == 0
+        assert store.all() == []
+        assert len(MessageStore("session", db_path=db_path)) == 0
@@ -0,0 +1,67 @@
+import os
+import sys
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+
+from semantic_cache import SemanticCache
+
+
+def fake_embed(text):
+    """Embed text as a bag of known words so similarity is predictable."""
+    vocabulary = ["customers", "orders", "how", "many", "total", "revenue"]
+    words = text.lower().replace("?", "").split()
+    return [float(words.count(word)) for word in vocabulary]
+
+
+class TestSemanticCache:
+    """Test suite for the semantic answer cache."""
+
+    @pytest.fixture
+    def cache(self):
+        return SemanticCache(threshold=0.9, max_entries=2, embed_fn=fake_embed)
+
+    def test_miss_on_empty_cache(self, cache):
+        """An empty cache never returns an answer."""
+        assert cache.lookup("How many customers?", "sqlite:///a.db") is None
+
+    def test_hit_on_similar_question(self, cache):
+        """A paraphrase with the same embedding reuses the cached answer."""
+        cache.put("How many customers?", "sqlite:///a.db", "500 customers")
+        assert cache.lookup("how many customers", "sqlite:///a.db") == "500 customers"
+
+    def test_miss_on_different_question(self, cache):
+        """Dissimilar questions fall below the threshold."""
+        cache.put("How many customers?", "sqlite:///a.db", "500 customers")
+        assert cache.lookup("Total revenue?", "sqlite:///a.db") is None
+
+    def test_entries_are_scoped_per_database(self, cache):
+        """Answers for one database are never served for another."""
+        cache.put("How many customers?", "sqlite:///a.db", "500 customers")
+        assert cache.lookup("How many customers?", "sqlite:///b.db") is None
+
+    def test_oldest_entry_evicted(self, cache):
+        """The cache keeps at most max_entries answers per database."""
+        cache.put("How many customers?", "sqlite:///a.db", "500 customers")
+        cache.put("How many orders?", "sqlite:///a.db", "1000 orders")
+        cache.put("Total revenue?", "sqlite:///a.db", "$1M")
+        assert cache.lookup("How many customers?", "sqlite:///a.db") is None
+        assert cache.lookup("Total revenue?", "sqlite:///a.db") == "$1M"
+
+    def test_clear(self, cache):
+        """Clearing a database drops its answers."""
+        cache.put("How many customers?", "sqlite:///a.db", "500 customers")
+        cache.clear("sqlite:///a.db")
+        assert cache.lookup("How many customers?", "sqlite:///a.db") is None
+
+    def test_expired_entry_missed(self, cache, monkeypatch):
+        """Answers older than the ttl are no longer served."""
+        now = [1000.0]
+        monkeypatch.setattr("semantic_cache.time.monotonic", lambda: now[0])
+        cache.put("How many customers?", "sqlite:///a.db", "500 customers")
+        now[0] += cache.ttl - 1
+        assert cache.lookup("How many customers?", "sqlite:///a.db") == "500 customers"
+        now[0] += 2
+        assert cache.lookup("How many customers?", "sqlite:///a.db") is None